@@ -6,17 +6,77 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import calendar
+import os
 from datetime import datetime
+from functools import lru_cache
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
 from dash import Dash, dcc, html
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State
+
+# Columns used by the dashboard
+SOURCE_COLUMNS = ['Order_Date', 'Hour', 'Year', 'Month', 'Region_ID',
+                  'Product_ID', 'Sales_Rep_ID', 'Quantity_Sold', 'Total_Sales', 'Profit', 'Return_Flag']
+
+# Day of week labels, Monday first, matching pandas' dayofweek codes
+DAY_NAMES = list(calendar.day_name)
+
+# Low-cardinality columns stored as categoricals so grouping and filtering work on integer codes
+CATEGORY_COLUMNS = ['Region_ID', 'Product_ID', 'Sales_Rep_ID', 'Month_Name', 'Time_of_Day', 'Year_Month']
+
+# Integer columns downcast to the smallest integer type that holds their values
+INTEGER_COLUMNS = ['Quantity_Sold', 'Hour', 'Year', 'Month', 'Quarter']
+
+# Columns the dashboard filters on; every pre-aggregated frame keeps them as keys
+FILTER_COLUMNS = ['Region_ID', 'Time_of_Day', 'Year']
+
+def set_table_column(table, name, values):
+    """Replace a column of an Arrow table by name"""
+    return table.set_column(table.schema.get_field_index(name), name, values)
+
+def normalize_sales_table(table):
+    """Give Order_Date and Return_Flag their final types, falling back to pandas for non-ISO input"""
+    # Arrow only infers ISO-8601 timestamps; other date formats are parsed like the original pd.to_datetime call
+    if pa.types.is_timestamp(table.schema.field('Order_Date').type):
+        order_date = table['Order_Date'].cast(pa.timestamp('ns'))
+    else:
+        order_date = pa.array(pd.to_datetime(table['Order_Date'].to_pandas()), type=pa.timestamp('ns'))
+    table = set_table_column(table, 'Order_Date', order_date)
+    
+    # Convert Return_Flag to boolean if it's not already
+    if not pa.types.is_boolean(table.schema.field('Return_Flag').type):
+        table = set_table_column(table, 'Return_Flag', pa.array(table['Return_Flag'].to_pandas().astype(bool)))
+    
+    return table
+
+def read_sales_table(file_path):
+    """Read sales data as an Arrow table, caching CSV files as Parquet"""
+    if file_path.endswith('.parquet'):
+        return normalize_sales_table(pq.read_table(file_path, columns=SOURCE_COLUMNS))
+    
+    # Reuse the Parquet cache next to the CSV unless the CSV is newer
+    cache_path = os.path.splitext(file_path)[0] + '.parquet'
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(file_path):
+        return pq.read_table(cache_path, columns=SOURCE_COLUMNS)
+    
+    # Column types are inferred by Arrow and normalized before caching, so the cache is always typed
+    convert_options = pv.ConvertOptions(include_columns=SOURCE_COLUMNS)
+    table = normalize_sales_table(pv.read_csv(file_path, convert_options=convert_options))
+    
+    try:
+        pq.write_table(table, cache_path)
+    except OSError:
+        # The data directory may be read-only; the cache is only an optimization
+        pass
+    
+    return table
 
 # Load the data
 def load_and_preprocess_data(file_path):
-    """Load and preprocess sales data from CSV file"""
-    df = pd.read_csv(file_path)
-    
-    # Convert date columns to datetime
-    df['Order_Date'] = pd.to_datetime(df['Order_Date'])
+    """Load and preprocess sales data from a CSV or Parquet file"""
+    df = read_sales_table(file_path).to_pandas()
     
     # Define time of day categories
     time_of_day = {
@@ -26,86 +86,215 @@ def load_and_preprocess_data(file_path):
         'Night': (21, 4)       # 9:00 PM - 4:59 AM
     }
     
-    # Add a time of day column
-    def categorize_time_of_day(hour):
-        if time_of_day['Morning'][0] <= hour <= time_of_day['Morning'][1]:
-            return 'Morning'
-        elif time_of_day['Afternoon'][0] <= hour <= time_of_day['Afternoon'][1]:
-            return 'Afternoon'
-        elif time_of_day['Evening'][0] <= hour <= time_of_day['Evening'][1]:
-            return 'Evening'
-        else:
-            return 'Night'
-            
-    df['Time_of_Day'] = df['Hour'].apply(categorize_time_of_day)
+    # Add a time of day column by bucketing hours on the start of each period;
+    # hours before the first start wrap around to Night
+    time_labels = list(time_of_day)
+    period_starts = np.array([start for start, _ in time_of_day.values()])
+    buckets = np.searchsorted(period_starts, df['Hour'].to_numpy(), side='right')
+    df['Time_of_Day'] = pd.Categorical.from_codes((buckets - 1) % len(time_labels),
+                                                  categories=time_labels, ordered=True)
     
-    # Add month-year for easier grouping
-    df['Month_Year'] = df['Order_Date'].dt.to_period('M')
+    # Derive the calendar columns from integer year and month values rather than per-row string formatting;
+    # rows without an order date get month 0, so their category code is -1 and the calendar columns are NaN
+    has_date = df['Order_Date'].notna().to_numpy()
+    year = df['Order_Date'].dt.year.fillna(0).astype(int).to_numpy()
+    month = df['Order_Date'].dt.month.fillna(0).astype(int).to_numpy()
     
     # Add a Month name column for readability
-    df['Month_Name'] = df['Order_Date'].dt.month_name()
+    df['Month_Name'] = pd.Categorical.from_codes(month - 1, categories=list(calendar.month_name)[1:])
     
     # Add Quarter
-    df['Quarter'] = df['Order_Date'].dt.quarter
+    df['Quarter'] = np.where(has_date, (month - 1) // 3 + 1, np.nan)
     
-    # Create a date key for YoY and MoM calculations
-    df['Year_Month'] = df['Order_Date'].dt.strftime('%Y-%m')
+    # Add the day of week as a categorical so its codes index the heatmap rows directly
+    day_codes = df['Order_Date'].dt.dayofweek.fillna(-1).astype(int).to_numpy()
+    df['Day_of_Week'] = pd.Categorical.from_codes(day_codes, categories=DAY_NAMES, ordered=True)
     
-    # Convert Return_Flag to boolean if it's not already
-    if df['Return_Flag'].dtype != bool:
-        df['Return_Flag'] = df['Return_Flag'].astype(bool)
+    # Create a date key for YoY and MoM calculations; only the distinct months are formatted as labels
+    month_keys, dated_codes = np.unique(year[has_date] * 12 + month[has_date] - 1, return_inverse=True)
+    month_labels = [f'{key // 12}-{key % 12 + 1:02d}' for key in month_keys]
+    month_codes = np.full(len(df), -1)
+    month_codes[has_date] = dated_codes
+    df['Year_Month'] = pd.Categorical.from_codes(month_codes, categories=month_labels)
+    
+    # Rows with zero sales or quantity get a margin / order size of 0 instead of inf or NaN
+    profit = df['Profit'].to_numpy()
+    sales = df['Total_Sales'].to_numpy()
+    quantity = df['Quantity_Sold'].to_numpy()
     
     # Calculate profit margin
-    df['Profit_Margin'] = (df['Profit'] / df['Total_Sales']) * 100
+    profit_margin = np.divide(profit, sales, out=np.zeros(len(df), dtype=np.float32), where=sales != 0)
+    df['Profit_Margin'] = profit_margin * 100
     
     # Calculate average order size
-    df['Order_Size'] = df['Total_Sales'] / df['Quantity_Sold']
+    df['Order_Size'] = np.divide(sales, quantity, out=np.zeros(len(df), dtype=np.float32), where=quantity != 0)
+    
+    # Downcast integer columns; money columns stay float64 so per-row cents are exact
+    for column in INTEGER_COLUMNS:
+        df[column] = pd.to_numeric(df[column], downcast='integer')
+    
+    for column in CATEGORY_COLUMNS:
+        df[column] = df[column].astype('category')
     
     return df
 
-def calculate_advanced_metrics(df):
-    """Calculate advanced metrics for the dashboard"""
+def filter_table(table, selected_regions, selected_times, selected_year):
+    """Filter an Arrow table holding the filter columns by the dashboard selections"""
+    conditions = []
+    if selected_regions:
+        conditions.append(pc.is_in(table['Region_ID'], value_set=pa.array(selected_regions)))
+    if selected_times:
+        conditions.append(pc.is_in(table['Time_of_Day'], value_set=pa.array(selected_times)))
+    if selected_year:
+        conditions.append(pc.equal(table['Year'], selected_year))
+    
+    # Nothing to filter, so the table can be used as-is
+    if not conditions:
+        return table
+    
+    mask = conditions[0]
+    for condition in conditions[1:]:
+        mask = pc.and_(mask, condition)
+    
+    return table.filter(mask)
+
+def aggregate_table(table, keys, aggregations):
+    """Group an Arrow table by keys and aggregate it"""
+    # aggregations maps each output column to a (source column, Arrow aggregate function) pair
+    grouped = table.group_by(keys).aggregate(list(aggregations.values()))
+    
+    # Arrow names results '<column>_<function>'; rename them to the requested output columns
+    output_names = {f'{column}_{function}': name for name, (column, function) in aggregations.items()}
+    grouped = grouped.rename_columns([output_names.get(name, name) for name in grouped.column_names])
+    
+    return grouped.select(keys + list(aggregations))
+
+def build_monthly_frame(table):
+    """Aggregate sales, quantity, profit, returns and profit margin per month in a single pass"""
+    # Profit margin is kept as a total with an order count so averages can be re-derived after filtering;
+    # returns get their own count, since Arrow's count skips rows whose margin is null
+    return aggregate_table(table, FILTER_COLUMNS + ['Year_Month', 'Month_Name', 'Month'], {
+        'Total_Sales': ('Total_Sales', 'sum'),
+        'Quantity_Sold': ('Quantity_Sold', 'sum'),
+        'Profit': ('Profit', 'sum'),
+        'Return_Flag': ('Return_Flag', 'sum'),
+        'Return_Flag_Count': ('Return_Flag', 'count'),
+        'Profit_Margin': ('Profit_Margin', 'sum'),
+        'Orders': ('Profit_Margin', 'count')
+    })
+
+def build_aggregates(df):
+    """Pre-aggregate the sales data for each plot as Arrow tables, keyed by the filter columns"""
+    # The aggregations run on Arrow's vectorized, multithreaded hash group-by;
+    # categorical columns become dictionary-encoded and convert back when the results go to pandas
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    aggregates = {}
+    
+    # Monthly totals, shared by the trend plots and the KPIs
+    aggregates['monthly'] = build_monthly_frame(table)
+    
+    # Sales by hour and day of week
+    aggregates['hourly'] = aggregate_table(table, FILTER_COLUMNS + ['Day_of_Week', 'Hour'], {
+        'Total_Sales': ('Total_Sales', 'sum')
+    })
+    
+    # Sales and returns per filter combination, used for the time of day and region plots
+    aggregates['summary'] = aggregate_table(table, FILTER_COLUMNS, {
+        'Total_Sales': ('Total_Sales', 'sum'),
+        'Return_Flag': ('Return_Flag', 'sum')  # Count returns
+    })
+    
+    # Sales and profit by product
+    aggregates['product'] = aggregate_table(table, FILTER_COLUMNS + ['Product_ID'], {
+        'Total_Sales': ('Total_Sales', 'sum'),
+        'Profit': ('Profit', 'sum')
+    })
+    
+    # Sales rep performance
+    aggregates['sales_rep'] = aggregate_table(table, FILTER_COLUMNS + ['Sales_Rep_ID'], {
+        'Total_Sales': ('Total_Sales', 'sum'),
+        'Profit': ('Profit', 'sum')
+    })
+    
+    return aggregates
+
+def build_dimension_totals(aggregates):
+    """Reduce the filtered pre-aggregates to the per-dimension totals shared by the plots and insights"""
+    summary = aggregates['summary']
+    totals = {}
+    
+    # Time_of_Day is an ordered categorical, so the sorted groups are already in chronological order
+    totals['time_of_day'] = summary.groupby('Time_of_Day', observed=True)['Total_Sales'].sum()
+    
+    # Sales and returns by region
+    totals['region'] = summary.groupby('Region_ID', observed=True, sort=False)[['Total_Sales', 'Return_Flag']].sum()
+    totals['region'] = totals['region'].rename(columns={'Return_Flag': 'Returns'})
+    
+    # Sales and profit by product
+    totals['product'] = aggregates['product'].groupby('Product_ID', observed=True, sort=False)[['Total_Sales', 'Profit']].sum()
+    
+    return totals
+
+def calculate_advanced_metrics(monthly):
+    """Calculate advanced metrics for the dashboard from the monthly aggregate"""
     metrics = {}
     
-    # Basic KPIs
-    metrics['Total_Sales'] = df['Total_Sales'].sum()
-    metrics['Total_Quantity'] = df['Quantity_Sold'].sum()
-    metrics['Total_Profit'] = df['Profit'].sum()
-    metrics['Avg_Order_Size'] = df['Total_Sales'].sum() / df['Quantity_Sold'].sum()
-    metrics['Return_Rate'] = df['Return_Flag'].mean() * 100
+    # Basic KPIs, reduced from the monthly totals rather than the individual orders
+    metrics['Total_Sales'] = monthly['Total_Sales'].sum()
+    metrics['Total_Quantity'] = monthly['Quantity_Sold'].sum()
+    metrics['Total_Profit'] = monthly['Profit'].sum()
+    metrics['Avg_Order_Size'] = metrics['Total_Sales'] / metrics['Total_Quantity']
+    metrics['Return_Rate'] = monthly['Return_Flag'].sum() / monthly['Return_Flag_Count'].sum() * 100
     
     # Monthly sales for growth calculations
-    monthly_sales = df.groupby('Year_Month')['Total_Sales'].sum().reset_index()
+    # Year_Month categories are sorted chronologically, so summing by category code gives the
+    # monthly sales in date order without building a groupby; months with no orders are dropped,
+    # as are orders without a date (code -1), which the original groupby left out as well
+    month_codes = monthly['Year_Month'].cat.codes.to_numpy()
+    dated = month_codes >= 0
+    month_codes = month_codes[dated]
+    month_count = len(monthly['Year_Month'].cat.categories)
+    sales_by_month = np.bincount(month_codes, weights=monthly['Total_Sales'].to_numpy()[dated], minlength=month_count)
+    monthly_sales = sales_by_month[np.bincount(month_codes, minlength=month_count) > 0]
     
     # Calculate MoM growth rate (if we have at least 2 months of data)
     if len(monthly_sales) >= 2:
-        current_month = monthly_sales.iloc[-1]['Total_Sales']
-        previous_month = monthly_sales.iloc[-2]['Total_Sales']
+        current_month = monthly_sales[-1]
+        previous_month = monthly_sales[-2]
         metrics['MoM_Growth'] = ((current_month - previous_month) / previous_month) * 100
     else:
         metrics['MoM_Growth'] = 0
     
     # Calculate YoY growth rate (if we have at least 13 months of data)
     if len(monthly_sales) >= 13:
-        current_month = monthly_sales.iloc[-1]['Total_Sales']
-        year_ago_month = monthly_sales.iloc[-13]['Total_Sales']
+        current_month = monthly_sales[-1]
+        year_ago_month = monthly_sales[-13]
         metrics['YoY_Growth'] = ((current_month - year_ago_month) / year_ago_month) * 100
     else:
         metrics['YoY_Growth'] = 0
     
     return metrics
 
+def top_n_positions(values, n):
+    """Return the positions of the n largest values, largest first, without sorting every value"""
+    if len(values) > n:
+        positions = np.argpartition(-values, n)[:n]
+    else:
+        positions = np.arange(len(values))
+    
+    return positions[np.argsort(-values[positions], kind='stable')]
+
 def plot_monthly_sales_trend(df):
     """Plot monthly sales trend"""
     # Group by year and month
-    monthly_sales = df.groupby(['Year', 'Month_Name', 'Month'])['Total_Sales'].sum().reset_index()
+    monthly_sales = df.groupby(['Year', 'Month_Name', 'Month'], observed=True, sort=False)['Total_Sales'].sum().reset_index()
     
     # Sort by year and month for proper time series
     monthly_sales['Month_Num'] = monthly_sales['Month']
     monthly_sales = monthly_sales.sort_values(['Year', 'Month_Num'])
     
     # Create a date label for the x-axis
-    monthly_sales['Date_Label'] = monthly_sales['Month_Name'] + ' ' + monthly_sales['Year'].astype(str)
+    monthly_sales['Date_Label'] = monthly_sales['Month_Name'].astype(str) + ' ' + monthly_sales['Year'].astype(str)
     
     # Create the plot
     fig = px.line(monthly_sales, x='Date_Label', y='Total_Sales', 
@@ -122,14 +311,17 @@ def plot_monthly_sales_trend(df):
 
 def plot_hourly_sales_heatmap(df):
     """Create a heatmap of sales by hour and day of week"""
-    # Group by day of week and hour
-    hourly_data = df.groupby(['Day_of_Week', 'Hour'])['Total_Sales'].sum().reset_index()
+    # Rows without a day of week (code -1) or with a missing or out of range hour have no cell in the grid
+    days = df['Day_of_Week'].cat.codes.to_numpy()
+    hours = df['Hour'].to_numpy(dtype=float)
+    in_grid = (days >= 0) & (hours >= 0) & (hours < 24)
     
-    # Create a pivot table
-    pivot_data = hourly_data.pivot(index='Day_of_Week', columns='Hour', values='Total_Sales')
+    # Accumulate sales straight into a day of week x hour grid
+    grid = np.zeros((len(DAY_NAMES), 24))
+    np.add.at(grid, (days[in_grid], hours[in_grid].astype(int)), df['Total_Sales'].to_numpy()[in_grid])
     
     # Create the heatmap
-    fig = px.imshow(pivot_data, 
+    fig = px.imshow(grid, x=list(range(24)), y=DAY_NAMES,
                     labels=dict(x="Hour of Day", y="Day of Week", color="Sales"),
                     title="Sales Heatmap by Hour and Day",
                     color_continuous_scale='Viridis')
@@ -138,19 +330,13 @@ def plot_hourly_sales_heatmap(df):
     
     return fig
 
-def plot_sales_by_time_of_day(df):
+def plot_sales_by_time_of_day(tod_sales):
     """Plot sales distribution by time of day"""
-    tod_sales = df.groupby('Time_of_Day')['Total_Sales'].sum().reset_index()
-    
-    # Sort in chronological order
-    time_order = ['Morning', 'Afternoon', 'Evening', 'Night']
-    tod_sales['Time_of_Day'] = pd.Categorical(tod_sales['Time_of_Day'], categories=time_order, ordered=True)
-    tod_sales = tod_sales.sort_values('Time_of_Day')
-    
     # Create the plot
-    fig = px.bar(tod_sales, x='Time_of_Day', y='Total_Sales',
+    fig = px.bar(x=tod_sales.index, y=tod_sales.values,
                  title='Sales by Time of Day',
-                 color='Time_of_Day')
+                 color=tod_sales.index,
+                 labels={'x': 'Time_of_Day', 'y': 'Total_Sales', 'color': 'Time_of_Day'})
     
     fig.update_layout(
         xaxis_title='Time of Day',
@@ -160,37 +346,25 @@ def plot_sales_by_time_of_day(df):
     
     return fig
 
-def plot_product_sales_share(df):
+def plot_product_sales_share(product_sales):
     """Create a pie chart showing sales distribution by product"""
-    product_sales = df.groupby('Product_ID')['Total_Sales'].sum().reset_index()
-    
-    # Sort and get the top 5, group others
-    top_products = product_sales.sort_values('Total_Sales', ascending=False).head(5)
-    other_products = pd.DataFrame({
-        'Product_ID': ['Others'],
-        'Total_Sales': [product_sales['Total_Sales'].sum() - top_products['Total_Sales'].sum()]
-    })
-    
-    plot_data = pd.concat([top_products, other_products])
+    # Get the top 5, group others
+    sales = product_sales.to_numpy()
+    top = top_n_positions(sales, 5)
+    names = list(product_sales.index[top]) + ['Others']
+    values = np.append(sales[top], sales.sum() - sales[top].sum())
     
     # Create the pie chart
-    fig = px.pie(plot_data, values='Total_Sales', names='Product_ID',
-                 title='Sales Share by Product (Top 5)')
+    fig = px.pie(values=values, names=names,
+                 title='Sales Share by Product (Top 5)',
+                 labels={'names': 'Product_ID', 'values': 'Total_Sales'})
     
     fig.update_layout(template='plotly_white')
     
     return fig
 
-def plot_sales_vs_returns(df):
+def plot_sales_vs_returns(region_data):
     """Create a comparison of sales vs returns by region"""
-    # Group by region
-    region_data = df.groupby('Region_ID').agg({
-        'Total_Sales': 'sum',
-        'Return_Flag': lambda x: (x == True).sum()  # Count returns
-    }).reset_index()
-    
-    region_data.rename(columns={'Return_Flag': 'Returns'}, inplace=True)
-    
     # Sort by total sales
     region_data = region_data.sort_values('Total_Sales', ascending=False)
     
@@ -198,14 +372,14 @@ def plot_sales_vs_returns(df):
     fig = go.Figure()
     
     fig.add_trace(go.Bar(
-        x=region_data['Region_ID'],
+        x=region_data.index,
         y=region_data['Total_Sales'],
         name='Total Sales',
         marker_color='royalblue'
     ))
     
     fig.add_trace(go.Bar(
-        x=region_data['Region_ID'],
+        x=region_data.index,
         y=region_data['Returns'],
         name='Returns',
         marker_color='red'
@@ -223,19 +397,15 @@ def plot_sales_vs_returns(df):
 
 def plot_profit_margin_trend(df):
     """Plot profit margin trend over time"""
-    # Group by month
-    monthly_margin = df.groupby('Month_Year')['Profit_Margin'].mean().reset_index()
-    
-    # Convert Period to string
-    monthly_margin['Month_Year'] = monthly_margin['Month_Year'].astype(str)
-    
-    # Sort by month
-    monthly_margin = monthly_margin.sort_values('Month_Year')
+    # Group by month and average over all orders; Year_Month categories are in chronological order
+    monthly_margin = df.groupby('Year_Month', observed=True)[['Profit_Margin', 'Orders']].sum()
+    average_margin = monthly_margin['Profit_Margin'] / monthly_margin['Orders']
     
     # Create the line chart
-    fig = px.line(monthly_margin, x='Month_Year', y='Profit_Margin',
+    fig = px.line(x=average_margin.index.astype(str), y=average_margin.values,
                   title='Average Profit Margin Trend',
-                  markers=True)
+                  markers=True,
+                  labels={'x': 'Year_Month', 'y': 'Profit_Margin'})
     
     fig.update_layout(
         xaxis_title='Month',
@@ -248,16 +418,16 @@ def plot_profit_margin_trend(df):
 def create_sales_rep_performance_chart(df):
     """Create a horizontal bar chart of sales rep performance"""
     # Get sales rep performance
-    rep_data = df.groupby('Sales_Rep_ID').agg({
+    rep_data = df.groupby('Sales_Rep_ID', observed=True, sort=False).agg({
         'Total_Sales': 'sum',
         'Profit': 'sum'
-    }).reset_index()
+    })
     
-    # Sort and get top 10
-    top_reps = rep_data.sort_values('Total_Sales', ascending=False).head(10)
+    # Get top 10
+    top_reps = rep_data.iloc[top_n_positions(rep_data['Total_Sales'].to_numpy(), 10)]
     
     # Create the horizontal bar chart
-    fig = px.bar(top_reps, y='Sales_Rep_ID', x='Total_Sales',
+    fig = px.bar(top_reps, y=top_reps.index, x='Total_Sales',
                  title='Top 10 Sales Representatives by Total Sales',
                  orientation='h',
                  color='Profit')
@@ -270,45 +440,97 @@ def create_sales_rep_performance_chart(df):
     
     return fig
 
-def generate_insights_and_recommendations(df):
-    """Generate insights and recommendations based on the data analysis"""
+def generate_insights_and_recommendations(totals):
+    """Generate insights and recommendations from the per-dimension totals"""
     insights = []
     recommendations = []
     
+    tod_sales = totals['time_of_day']
+    product_sales = totals['product']['Total_Sales']
+    product_profit = totals['product']['Profit']
+    region_sales = totals['region']['Total_Sales']
+    total_sales = tod_sales.sum()
+    
     # Insight 1: Peak Sales Time
-    tod_sales = df.groupby('Time_of_Day')['Total_Sales'].sum().reset_index()
-    peak_time = tod_sales.loc[tod_sales['Total_Sales'].idxmax()]['Time_of_Day']
-    peak_sales_percentage = (tod_sales.loc[tod_sales['Time_of_Day'] == peak_time, 'Total_Sales'].values[0] / df['Total_Sales'].sum()) * 100
+    peak_time = tod_sales.idxmax()
+    peak_sales_percentage = (tod_sales[peak_time] / total_sales) * 100
     insights.append(f"Peak sales occur during {peak_time}, accounting for {peak_sales_percentage:.1f}% of total sales")
     
     # Insight 2: Best Performing Product
-    product_sales = df.groupby('Product_ID')['Total_Sales'].sum().reset_index()
-    top_product = product_sales.loc[product_sales['Total_Sales'].idxmax()]
-    product_contribution = (top_product['Total_Sales'] / df['Total_Sales'].sum()) * 100
-    insights.append(f"Product {top_product['Product_ID']} is the best performer, generating ${top_product['Total_Sales']:,.2f} in sales ({product_contribution:.1f}% of total sales)")
+    top_product = product_sales.idxmax()
+    product_contribution = (product_sales[top_product] / total_sales) * 100
+    insights.append(f"Product {top_product} is the best performer, generating ${product_sales[top_product]:,.2f} in sales ({product_contribution:.1f}% of total sales)")
     
     # Insight 3: Best Performing Region
-    region_sales = df.groupby('Region_ID')['Total_Sales'].sum().reset_index()
-    top_region = region_sales.loc[region_sales['Total_Sales'].idxmax()]
-    region_contribution = (top_region['Total_Sales'] / df['Total_Sales'].sum()) * 100
-    insights.append(f"Region {top_region['Region_ID']} is the best performing region, generating ${top_region['Total_Sales']:,.2f} in sales ({region_contribution:.1f}% of total sales)")
+    top_region = region_sales.idxmax()
+    region_contribution = (region_sales[top_region] / total_sales) * 100
+    insights.append(f"Region {top_region} is the best performing region, generating ${region_sales[top_region]:,.2f} in sales ({region_contribution:.1f}% of total sales)")
     
     # Recommendation 1: Based on time analysis
     recommendations.append(f"Increase marketing and sales efforts during {peak_time} to maximize sales")
     
     # Recommendation 2: Based on product performance
-    product_profit = df.groupby('Product_ID')['Profit'].sum().reset_index()
-    high_margin_product = product_profit.loc[product_profit['Profit'].idxmax()]
-    recommendations.append(f"Focus on Product {high_margin_product['Product_ID']} which generates the highest profit margin (${high_margin_product['Profit']:,.2f})")
+    high_margin_product = product_profit.idxmax()
+    recommendations.append(f"Focus on Product {high_margin_product} which generates the highest profit margin (${product_profit[high_margin_product]:,.2f})")
     
     return insights, recommendations
 
+# Monthly aggregate columns shipped to the browser for the KPI callback
+KPI_STORE_COLUMNS = FILTER_COLUMNS + ['Year_Month', 'Total_Sales', 'Quantity_Sold', 'Profit', 'Return_Flag', 'Return_Flag_Count']
+
+# Browser-side version of calculate_advanced_metrics: filters the stored monthly rows
+# and formats the KPI cards, so changing a filter does not need a server round trip for them.
+# The initial cards come from calculate_advanced_metrics; keep the KPI formulas in both in sync
+KPI_CLIENTSIDE_FUNCTION = """
+function(selectedRegions, selectedTimes, selectedYear, rows) {
+    const selected = rows.filter(row =>
+        (!selectedRegions || selectedRegions.length === 0 || selectedRegions.includes(row.Region_ID)) &&
+        (!selectedTimes || selectedTimes.length === 0 || selectedTimes.includes(row.Time_of_Day)) &&
+        (!selectedYear || row.Year === selectedYear));
+    
+    let sales = 0, quantity = 0, profit = 0, returns = 0, flagged = 0;
+    const monthlySales = {};
+    for (const row of selected) {
+        sales += row.Total_Sales;
+        quantity += row.Quantity_Sold;
+        profit += row.Profit;
+        returns += row.Return_Flag;
+        flagged += row.Return_Flag_Count;
+        monthlySales[row.Year_Month] = (monthlySales[row.Year_Month] || 0) + row.Total_Sales;
+    }
+    
+    // Year_Month keys are 'YYYY-MM', so a string sort is chronological
+    const months = Object.keys(monthlySales).sort();
+    let momGrowth = 0;
+    if (months.length >= 2) {
+        const currentMonth = monthlySales[months[months.length - 1]];
+        const previousMonth = monthlySales[months[months.length - 2]];
+        momGrowth = ((currentMonth - previousMonth) / previousMonth) * 100;
+    }
+    
+    const money = value => '$' + value.toLocaleString('en-US', {minimumFractionDigits: 2, maximumFractionDigits: 2});
+    const percent = value => value.toFixed(2) + '%';
+    return [money(sales), quantity.toLocaleString('en-US'), money(profit),
+            money(sales / quantity), percent(momGrowth), percent((returns / flagged) * 100)];
+}
+"""
+
 def create_dash_app(file_path):
     """Create an interactive Dash web app for the dashboard"""
     # Load and process data
     df = load_and_preprocess_data(file_path)
-    metrics = calculate_advanced_metrics(df)
-    insights, recommendations = generate_insights_and_recommendations(df)
+    aggregates = build_aggregates(df)
+    
+    def filter_aggregates(selected_regions, selected_times, selected_year):
+        """Slice every pre-aggregated table for a filter selection and convert it for plotting"""
+        return {name: filter_table(table, selected_regions, selected_times, selected_year).to_pandas()
+                for name, table in aggregates.items()}
+    
+    # Unfiltered pre-aggregates for the initial figures
+    initial = filter_aggregates((), (), None)
+    metrics = calculate_advanced_metrics(initial['monthly'])
+    initial_totals = build_dimension_totals(initial)
+    insights, recommendations = generate_insights_and_recommendations(initial_totals)
     
     # Create Dash app
     app = Dash(__name__)
@@ -360,6 +582,10 @@ def create_dash_app(file_path):
         # KPI Section
         html.Div([
             html.H3("Key Performance Indicators", style={'marginBottom': '10px'}),
+            
+            # Monthly totals used by the clientside KPI callback
+            dcc.Store(id='kpi-data', data=initial['monthly'][KPI_STORE_COLUMNS].to_dict('records')),
+            
             html.Div([
                 # Total Sales
                 html.Div([
@@ -404,13 +630,13 @@ def create_dash_app(file_path):
             # Monthly Sales Trend
             html.Div([
                 html.H3("Monthly Sales Trend"),
-                dcc.Graph(id='monthly-trend', figure=plot_monthly_sales_trend(df))
+                dcc.Graph(id='monthly-trend', figure=plot_monthly_sales_trend(initial['monthly']))
             ], style={'width': '48%', 'display': 'inline-block'}),
             
             # Sales by Time of Day
             html.Div([
                 html.H3("Sales by Time of Day"),
-                dcc.Graph(id='time-of-day', figure=plot_sales_by_time_of_day(df))
+                dcc.Graph(id='time-of-day', figure=plot_sales_by_time_of_day(initial_totals['time_of_day']))
             ], style={'width': '48%', 'display': 'inline-block', 'float': 'right'})
         ], style={'marginBottom': '20px'}),
         
@@ -419,13 +645,13 @@ def create_dash_app(file_path):
             # Hourly Sales Heatmap
             html.Div([
                 html.H3("Sales Heatmap by Hour and Day"),
-                dcc.Graph(id='hourly-heatmap', figure=plot_hourly_sales_heatmap(df))
+                dcc.Graph(id='hourly-heatmap', figure=plot_hourly_sales_heatmap(initial['hourly']))
             ], style={'width': '48%', 'display': 'inline-block'}),
             
             # Product Sales Share
             html.Div([
                 html.H3("Sales Share by Product"),
-                dcc.Graph(id='product-share', figure=plot_product_sales_share(df))
+                dcc.Graph(id='product-share', figure=plot_product_sales_share(initial_totals['product']['Total_Sales']))
             ], style={'width': '48%', 'display': 'inline-block', 'float': 'right'})
         ], style={'marginBottom': '20px'}),
         
@@ -434,20 +660,20 @@ def create_dash_app(file_path):
             # Sales vs Returns
             html.Div([
                 html.H3("Sales vs Returns by Region"),
-                dcc.Graph(id='sales-vs-returns', figure=plot_sales_vs_returns(df))
+                dcc.Graph(id='sales-vs-returns', figure=plot_sales_vs_returns(initial_totals['region']))
             ], style={'width': '48%', 'display': 'inline-block'}),
             
             # Profit Margin Trend
             html.Div([
                 html.H3("Profit Margin Trend"),
-                dcc.Graph(id='profit-margin', figure=plot_profit_margin_trend(df))
+                dcc.Graph(id='profit-margin', figure=plot_profit_margin_trend(initial['monthly']))
             ], style={'width': '48%', 'display': 'inline-block', 'float': 'right'})
         ], style={'marginBottom': '20px'}),
         
         # Sales Rep Performance
         html.Div([
             html.H3("Top Sales Representatives"),
-            dcc.Graph(id='sales-rep', figure=create_sales_rep_performance_chart(df))
+            dcc.Graph(id='sales-rep', figure=create_sales_rep_performance_chart(initial['sales_rep']))
         ], style={'marginBottom': '20px'}),
         
         # Insights and Recommendations Section
@@ -466,6 +692,33 @@ def create_dash_app(file_path):
         ], style={'padding': '10px', 'backgroundColor': '#f8f9fa', 'marginBottom': '20px', 'borderRadius': '5px'}),
     ])
 
+    @lru_cache(maxsize=128)
+    def compute_dashboard(selected_regions, selected_times, selected_year):
+        """Build the figures and insights for a filter selection, memoized across callbacks"""
+        # Slice the pre-aggregated frames
+        filtered = filter_aggregates(selected_regions, selected_times, selected_year)
+        totals = build_dimension_totals(filtered)
+        
+        # Update visualizations
+        monthly_trend_fig = plot_monthly_sales_trend(filtered['monthly'])
+        time_of_day_fig = plot_sales_by_time_of_day(totals['time_of_day'])
+        hourly_heatmap_fig = plot_hourly_sales_heatmap(filtered['hourly'])
+        product_share_fig = plot_product_sales_share(totals['product']['Total_Sales'])
+        sales_vs_returns_fig = plot_sales_vs_returns(totals['region'])
+        profit_margin_fig = plot_profit_margin_trend(filtered['monthly'])
+        sales_rep_fig = create_sales_rep_performance_chart(filtered['sales_rep'])
+        
+        # Generate new insights and recommendations
+        new_insights, new_recommendations = generate_insights_and_recommendations(totals)
+        
+        # Create lists for insights and recommendations
+        insights_list = html.Ul([html.Li(insight) for insight in new_insights])
+        recommendations_list = html.Ul([html.Li(recommendation) for recommendation in new_recommendations])
+        
+        return (monthly_trend_fig, time_of_day_fig, hourly_heatmap_fig,
+                product_share_fig, sales_vs_returns_fig, profit_margin_fig,
+                sales_rep_fig, insights_list, recommendations_list)
+
     # Callbacks for interactive filtering
     @app.callback(
         [Output('monthly-trend', 'figure'),
@@ -475,12 +728,6 @@ def create_dash_app(file_path):
          Output('sales-vs-returns', 'figure'),
          Output('profit-margin', 'figure'),
          Output('sales-rep', 'figure'),
-         Output('total-sales', 'children'),
-         Output('total-quantity', 'children'),
-         Output('total-profit', 'children'),
-         Output('avg-order-size', 'children'),
-         Output('mom-growth', 'children'),
-         Output('return-rate', 'children'),
          Output('insights-list', 'children'),
          Output('recommendations-list', 'children')],
         [Input('region-filter', 'value'),
@@ -488,49 +735,25 @@ def create_dash_app(file_path):
          Input('year-filter', 'value')]
     )
     def update_dashboard(selected_regions, selected_times, selected_year):
-        # Create a copy of the dataframe for filtering
-        filtered_df = df.copy()
-        
-        # Apply filters
-        if selected_regions:
-            filtered_df = filtered_df[filtered_df['Region_ID'].isin(selected_regions)]
-        if selected_times:
-            filtered_df = filtered_df[filtered_df['Time_of_Day'].isin(selected_times)]
-        if selected_year:
-            filtered_df = filtered_df[filtered_df['Year'] == selected_year]
-        
-        # Recalculate metrics
-        metrics = calculate_advanced_metrics(filtered_df)
-        
-        # Update visualizations
-        monthly_trend_fig = plot_monthly_sales_trend(filtered_df)
-        time_of_day_fig = plot_sales_by_time_of_day(filtered_df)
-        hourly_heatmap_fig = plot_hourly_sales_heatmap(filtered_df)
-        product_share_fig = plot_product_sales_share(filtered_df)
-        sales_vs_returns_fig = plot_sales_vs_returns(filtered_df)
-        profit_margin_fig = plot_profit_margin_trend(filtered_df)
-        sales_rep_fig = create_sales_rep_performance_chart(filtered_df)
-        
-        # Update KPI values
-        total_sales = f"${metrics['Total_Sales']:,.2f}"
-        total_quantity = f"{metrics['Total_Quantity']:,}"
-        total_profit = f"${metrics['Total_Profit']:,.2f}"
-        avg_order_size = f"${metrics['Avg_Order_Size']:,.2f}"
-        mom_growth = f"{metrics['MoM_Growth']:.2f}%"
-        return_rate = f"{metrics['Return_Rate']:.2f}%"
-        
-        # Generate new insights and recommendations
-        new_insights, new_recommendations = generate_insights_and_recommendations(filtered_df)
-        
-        # Create lists for insights and recommendations
-        insights_list = html.Ul([html.Li(insight) for insight in new_insights])
-        recommendations_list = html.Ul([html.Li(recommendation) for recommendation in new_recommendations])
-        
-        return (monthly_trend_fig, time_of_day_fig, hourly_heatmap_fig,
-                product_share_fig, sales_vs_returns_fig, profit_margin_fig,
-                sales_rep_fig, total_sales, total_quantity, total_profit,
-                avg_order_size, mom_growth, return_rate,
-                insights_list, recommendations_list)
+        # Selections are converted to tuples so the outputs can be cached
+        return compute_dashboard(tuple(selected_regions or ()), tuple(selected_times or ()), selected_year)
+
+    # KPI cards are recalculated in the browser from the stored monthly totals;
+    # the layout already holds the unfiltered values, so skip the call on page load
+    app.clientside_callback(
+        KPI_CLIENTSIDE_FUNCTION,
+        [Output('total-sales', 'children'),
+         Output('total-quantity', 'children'),
+         Output('total-profit', 'children'),
+         Output('avg-order-size', 'children'),
+         Output('mom-growth', 'children'),
+         Output('return-rate', 'children')],
+        [Input('region-filter', 'value'),
+         Input('time-filter', 'value'),
+         Input('year-filter', 'value')],
+        State('kpi-data', 'data'),
+        prevent_initial_call=True
+    )
 
     return app
 